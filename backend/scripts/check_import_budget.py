@@ -0,0 +1,80 @@
+"""
+Check that importing the application stays cheap.
+
+Runs `python -X importtime -c "import src.main"` in a fresh interpreter and fails if
+a heavy ML or cloud SDK is imported eagerly, or if the import time or peak RSS
+goes over budget. Run from the backend directory:
+
+    python scripts/check_import_budget.py
+"""
+import os
+import subprocess
+import sys
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "3000"))
+RSS_BUDGET_MB = float(os.getenv("RSS_BUDGET_MB", "250"))
+
+# Top-level packages that must only be loaded on first use or by face_service.warm_up().
+LAZY_PACKAGES = ("tensorflow", "keras", "tf_keras", "deepface", "cv2", "cloudinary", "retinaface", "mtcnn")
+
+PROBE = (
+    "import resource, sys\n"
+    "import src.main\n"
+    "rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+    "print(rss * (1 if sys.platform == 'darwin' else 1024))\n"
+)
+
+
+def parse_importtime(stderr: str) -> dict:
+    """
+    Return the cumulative import time in microseconds of every module, keyed by name.
+    """
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = int(cumulative)
+    return timings
+
+
+def main() -> int:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        print(result.stderr)
+        return result.returncode
+
+    timings = parse_importtime(result.stderr)
+    rss_bytes = int(result.stdout.strip().splitlines()[-1])
+    import_ms = timings.get("src.main", 0) / 1000
+    rss_mb = rss_bytes / (1024 * 1024)
+
+    print(f"import src.main: {import_ms:.0f} ms (budget {IMPORT_BUDGET_MS:.0f} ms)")
+    print(f"peak RSS: {rss_mb:.0f} MB (budget {RSS_BUDGET_MB:.0f} MB)")
+    print("slowest imports:")
+    for name, cumulative in sorted(timings.items(), key=lambda t: t[1], reverse=True)[:10]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    failures = []
+    eager = sorted({name.split(".")[0] for name in timings if name.split(".")[0] in LAZY_PACKAGES})
+    if eager:
+        failures.append(f"imported eagerly: {', '.join(eager)}")
+    if import_ms > IMPORT_BUDGET_MS:
+        failures.append(f"import time {import_ms:.0f} ms is over budget")
+    if rss_mb > RSS_BUDGET_MB:
+        failures.append(f"peak RSS {rss_mb:.0f} MB is over budget")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+Compare the quantized TFLite inference mode with the full-precision Keras model.
+
+Takes a directory of face images with one sub-directory per person, embeds every
+image with both paths, and reports embedding drift, verification agreement,
+latency and RSS. Fails if drift or decision flips exceed the limits. Run from
+the backend directory:
+
+    FACE_TFLITE_QUANTIZATION=int8 python scripts/tflite_parity.py path/to/faces
+"""
+import argparse
+import itertools
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.face_service import (
+    LocalFaceBackend, TFLiteFaceBackend, MODEL_NAME, TFLITE_QUANTIZATION, TFLITE_THREADS, is_same_face
+)
+from src.utils.tflite_utils import TFLiteEmbedder, load_or_convert
+import numpy as np
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def load_images(image_dir: str) -> list:
+    images = []
+    for person in sorted(os.listdir(image_dir)):
+        person_dir = os.path.join(image_dir, person)
+        if not os.path.isdir(person_dir):
+            continue
+        for name in sorted(os.listdir(person_dir)):
+            if name.lower().endswith((".jpg", ".jpeg", ".png")):
+                images.append((person, os.path.join(person_dir, name)))
+    return images
+
+
+def timed_embed(backend, faces: list) -> tuple:
+    embeddings, timings = [], []
+    for face in faces:
+        start = time.perf_counter()
+        embeddings.append(backend.embed([face])[0])
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.stack(embeddings), timings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("image_dir")
+    parser.add_argument("--max-drift", type=float, default=0.02, help="maximum cosine distance between the two embeddings of an image")
+    parser.add_argument("--max-flips", type=int, default=0, help="maximum number of pairs whose verification decision changes")
+    args = parser.parse_args()
+
+    images = load_images(args.image_dir)
+    baseline_rss = rss_mb()
+    keras_backend = LocalFaceBackend()
+    keras_backend.warm_up()
+    keras_rss = rss_mb() - baseline_rss
+
+    labels, faces = [], []
+    for person, path in images:
+        try:
+            faces.append(keras_backend.detect(path))
+            labels.append(person)
+        except ValueError:
+            print(f"skipped (no face): {path}")
+    if len(faces) < 2:
+        print("Need at least two images with a detectable face.")
+        return 1
+
+    # Convert (or load the cached graph) first, with the Keras model that is already
+    # loaded, so the RSS below only covers the interpreter and not the conversion.
+    path = load_or_convert(MODEL_NAME, TFLITE_QUANTIZATION, lambda: keras_backend._model().model, detect=keras_backend.detect)
+    before_tflite = rss_mb()
+    embedder = TFLiteEmbedder(path, num_threads=TFLITE_THREADS)
+    tflite_rss = rss_mb() - before_tflite
+    tflite_backend = TFLiteFaceBackend(embedder)
+
+    keras_embeddings, keras_ms = timed_embed(keras_backend, faces)
+    tflite_embeddings, tflite_ms = timed_embed(tflite_backend, faces)
+
+    drift = 1 - np.sum(keras_embeddings * tflite_embeddings, axis=1)
+    pairs = list(itertools.combinations(range(len(faces)), 2))
+    flips = 0
+    keras_correct = tflite_correct = 0
+    for i, j in pairs:
+        same_person = labels[i] == labels[j]
+        keras_decision = is_same_face(keras_embeddings[i], keras_embeddings[j])
+        tflite_decision = is_same_face(tflite_embeddings[i], tflite_embeddings[j])
+        flips += keras_decision != tflite_decision
+        keras_correct += keras_decision == same_person
+        tflite_correct += tflite_decision == same_person
+
+    print(f"images: {len(faces)}, pairs: {len(pairs)}, quantization: {TFLITE_QUANTIZATION}")
+    print(f"embedding drift (cosine): mean {drift.mean():.5f}, max {drift.max():.5f}")
+    print(f"decision flips: {flips}")
+    print(f"pair accuracy: keras {keras_correct / len(pairs):.3f}, tflite {tflite_correct / len(pairs):.3f}")
+    # The first call of each path includes graph tracing / tensor allocation.
+    print(f"latency per face: keras {np.median(keras_ms[1:] or keras_ms):.1f} ms, tflite {np.median(tflite_ms[1:] or tflite_ms):.1f} ms (median)")
+    print(f"RSS added by model: keras {keras_rss:.0f} MB, tflite {tflite_rss:.0f} MB")
+
+    failures = []
+    if drift.max() > args.max_drift:
+        failures.append(f"max drift {drift.max():.5f} is over {args.max_drift}")
+    if flips > args.max_flips:
+        failures.append(f"{flips} decision flips is over {args.max_flips}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
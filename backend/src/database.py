@@ -1,6 +1,6 @@
 import os
 from dotenv import load_dotenv
-from tortoise import Tortoise
+from tortoise import Tortoise, run_async
 from tortoise.contrib.fastapi import register_tortoise
 from fastapi import FastAPI
 
@@ -9,11 +9,15 @@ load_dotenv()
 DB_URL = os.getenv("DATABASE_URL")
 
 async def init_db():
+    """
+    Create any missing tables and indexes. Existing tables are left untouched,
+    so this is safe to run on every deployment.
+    """
     await Tortoise.init(
         db_url=DB_URL,
         modules={"models": ["src.models", "aerich.models"]}
     )
-    await Tortoise.generate_schemas()
+    await Tortoise.generate_schemas(safe=True)
 
 TORTOISE_ORM = {
     "connections": {"default": DB_URL},
@@ -31,4 +35,9 @@ def init_orm(app: FastAPI):
         config=TORTOISE_ORM,
         generate_schemas=False,
         add_exception_handlers=True,
-    )
\ No newline at end of file
+    )
+
+
+if __name__ == "__main__":
+    # python -m src.database
+    run_async(init_db())
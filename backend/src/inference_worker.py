@@ -0,0 +1,117 @@
+"""
+Local inference worker that owns the face recognition model.
+
+Web workers started with FACE_BACKEND=worker send images here over a Unix socket
+instead of loading TensorFlow themselves. Images are fetched and faces detected
+concurrently on a thread pool; faces ready within BATCH_WINDOW_MS of each other
+share one forward pass on the model thread.
+
+    python -m src.inference_worker
+"""
+from concurrent.futures import ThreadPoolExecutor
+from src.utils.face_service import LocalFaceBackend, FACE_WORKER_SOCKET, create_local_backend
+from src.utils.inference_rpc import encode_message, decode_image, read_message
+import asyncio
+import os
+
+
+BATCH_WINDOW_MS = float(os.getenv("FACE_BATCH_WINDOW_MS", "5"))
+MAX_BATCH_SIZE = int(os.getenv("FACE_MAX_BATCH_SIZE", "16"))
+DETECT_THREADS = int(os.getenv("FACE_DETECT_THREADS", str(os.cpu_count() or 1)))
+
+
+class MicroBatcher:
+    """
+    Collect preprocessed faces from concurrent requests and embed them as one batch.
+    """
+
+    def __init__(self, backend: LocalFaceBackend, window_ms: float = BATCH_WINDOW_MS, max_size: int = MAX_BATCH_SIZE):
+        self.backend = backend
+        self.window = window_ms / 1000
+        self.max_size = max_size
+        self.queue = asyncio.Queue()
+        # A single thread runs the model so TensorFlow keeps all cores for one batch at a time.
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    async def embed(self, face):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((face, future))
+        return await future
+
+    async def _collect(self) -> list:
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        deadline = loop.time() + self.window
+        while len(batch) < self.max_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            faces = [face for face, _ in batch]
+            try:
+                results = await loop.run_in_executor(self.executor, self.backend.embed, faces)
+            except Exception as e:
+                results = [e] * len(batch)
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+
+async def handle_connection(batcher: MicroBatcher, detector: ThreadPoolExecutor, reader, writer):
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            try:
+                header, payload = await read_message(reader)
+            except asyncio.IncompleteReadError:
+                break
+            if header.get("op") == "ping":
+                writer.write(encode_message({"ok": True, "threshold": batcher.backend.threshold()}))
+            elif header.get("op") == "represent":
+                try:
+                    face = await loop.run_in_executor(detector, batcher.backend.detect, decode_image(header, payload))
+                    embedding = await batcher.embed(face)
+                    writer.write(encode_message({"ok": True}, embedding.astype("float32").tobytes()))
+                except ValueError as e:
+                    writer.write(encode_message({"error": "no_face", "detail": str(e)}))
+                except Exception as e:
+                    writer.write(encode_message({"error": "internal", "detail": str(e)}))
+            else:
+                writer.write(encode_message({"error": "internal", "detail": f"Unknown operation: {header.get('op')}"}))
+            await writer.drain()
+    finally:
+        writer.close()
+
+
+async def serve(socket_path: str = FACE_WORKER_SOCKET):
+    backend = create_local_backend()
+    backend.warm_up()
+    batcher = MicroBatcher(backend)
+    # Downloading and detection run here in parallel; only the forward pass is serialized.
+    detector = ThreadPoolExecutor(max_workers=DETECT_THREADS)
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    server = await asyncio.start_unix_server(
+        lambda reader, writer: handle_connection(batcher, detector, reader, writer),
+        path=socket_path
+    )
+    print(f"Inference worker listening on {socket_path}")
+    async with server:
+        await asyncio.gather(server.serve_forever(), batcher.run())
+
+
+if __name__ == "__main__":
+    asyncio.run(serve())
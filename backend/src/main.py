@@ -1,9 +1,12 @@
 from fastapi import FastAPI
 from src.database import init_db, init_orm
 from src.routes import auth, admins, users
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from src.utils.scheduler_utils import LeaderScheduler
 from src.utils.attendance_utils import initialize_attendance
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
+from src.utils import face_service
+import os
 
 app = FastAPI()
 init_orm(app)
@@ -14,21 +17,27 @@ app.include_router(admins.router)
 app.include_router(users.router)
 
 
-scheduler = AsyncIOScheduler()
+scheduler = LeaderScheduler()
 scheduler.add_job(initialize_attendance, "cron", hour=0, minute=0)
 
+# Load the recognition model at startup instead of on the first check-in.
+FACE_WARMUP = os.getenv("FACE_WARMUP", "false").lower() in ("1", "true", "yes")
+
 
 @app.on_event("startup")
 async def startup_event():
     # await init_db()
     # await initialize_attendance()
-    scheduler.start()
+    await scheduler.start()
     print("Scheduler started")
+    if FACE_WARMUP:
+        await run_in_threadpool(face_service.warm_up)
+        print("Face recognition model loaded")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    scheduler.shutdown()
+    await scheduler.shutdown()
     print("Scheduler shutdown")
 
 
@@ -24,3 +24,28 @@ class Attendance(Model):
     status = fields.CharField(max_length=20, default="Pending")
     class Meta:
         table = "attendances"
+        indexes = (("user", "date"),)
+
+
+class SchedulerLease(Model):
+    name = fields.CharField(max_length=50, pk=True)
+    holder = fields.CharField(max_length=255)
+    expires_at = fields.DatetimeField()
+    class Meta:
+        table = "scheduler_leases"
+
+
+class JobState(Model):
+    job_id = fields.CharField(max_length=100, pk=True)
+    last_run_at = fields.DatetimeField()
+    class Meta:
+        table = "job_states"
+
+
+class CheckInFailure(Model):
+    failure_id = fields.IntField(pk=True, generated=True)
+    user = fields.ForeignKeyField("models.User", related_name="checkin_failures", on_delete=fields.CASCADE)
+    failed_at = fields.DatetimeField()
+    class Meta:
+        table = "checkin_failures"
+        indexes = (("user", "failed_at"),)
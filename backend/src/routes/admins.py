@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Form, HTTPException, status, Depends, UploadFile, File
+from fastapi import APIRouter, Form, HTTPException, status, Depends, UploadFile, File, Query, Request, Response
 from src.utils.auth_utils import get_current_admin, get_password_hash
 from src.utils.file_utils import upload_image, delete_image
 from src.utils.filter_utils import get_user_by_id, filter_by_attendance, filter_by_user
 from src.utils.validate_utils import validate_data
+from src.utils.history_utils import get_attendance_rows, resolve_date_range, not_modified, invalidate_attendance_history
 from src.models import User, Attendance
 from typing import List
+from datetime import date
 
 
 router = APIRouter(prefix="/admins", tags=["admins"])
@@ -161,6 +163,7 @@ async def delete_user(
         user = await get_user_by_id(user_id=user_id)
         delete_image(user.face_public_id)
         await user.delete()
+        invalidate_attendance_history(user_id)
         return {"message": "User deleted successfully."}
     except Exception as e:
         raise HTTPException(
@@ -215,18 +218,23 @@ async def get_daily_attendance(
 
 @router.get("/attendance/{user_id}", response_model=List[dict])
 async def get_user_attendance(
+    request: Request,
+    response: Response,
     user_id: int,
     year: int = None,
     month: int = None,
     day: int = None,
     status: str = None,
+    date_from: date = Query(None, alias="from"),
+    date_to: date = Query(None, alias="to"),
     current_admin: User = Depends(get_current_admin)
 ):
     """
     Admin views the attendance records of a specific user by ID.
     """
     user = await get_user_by_id(user_id=user_id)
-    attendances = await Attendance.filter(user=user).order_by("-date")
+    date_from, date_to = resolve_date_range(date_from, date_to, year=year, month=month)
+    attendances = await get_attendance_rows(user.user_id, date_from=date_from, date_to=date_to)
     filtered_attendances = filter_by_attendance(
         attendances,
         day=day,
@@ -234,7 +242,7 @@ async def get_user_attendance(
         year=year,
         status=status
     )
-    return [
+    payload = [
         {
             "attendance_id": att.attendance_id,
             "date": att.date,
@@ -243,3 +251,4 @@ async def get_user_attendance(
         }
         for att in filtered_attendances
     ]
+    return not_modified(request, response, payload) or payload
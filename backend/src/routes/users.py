@@ -1,9 +1,17 @@
-from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File
-from src.utils.auth_utils import get_current_user
-from src.utils.file_utils import upload_image, delete_image, verify_faces, process_attendance
+from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File, WebSocket, WebSocketDisconnect, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from src.utils.auth_utils import get_current, get_current_user
+from src.utils.file_utils import verify_check_in, process_attendance
+from src.utils.checkin_utils import check_failed_attempts, record_failed_attempt, clear_failed_attempts
+from src.utils.stream_utils import StreamVerifier, verify_clip, MAX_STREAM_FRAMES, MAX_CLIP_BYTES, CLIP_CHUNK_SIZE
 from src.utils.filter_utils import filter_by_attendance
-from src.models import User, Attendance
+from src.utils.history_utils import get_attendance_rows, resolve_date_range, not_modified
+from src.models import User
 from typing import List
+from datetime import date
+import asyncio
+import tempfile
 
 
 router = APIRouter(prefix="/users", tags=["users"])
@@ -31,16 +39,14 @@ async def record_attendance(
     """ 
     Allow a user to record attendance using face verification.
     """
-    upload_result = await upload_image(face_image, folder="temp")
-    temp_url = upload_result["secure_url"]
-    temp_public_id = upload_result["public_id"]
+    await check_failed_attempts(current_user.user_id)
     try:
         if not current_user.face_url:
             raise HTTPException(
                 status_code=400, 
                 detail="User has not uploaded a face image."
             )
-        if verify_faces(temp_url, current_user.face_url):
+        if await verify_check_in(face_image, current_user):
             return await process_attendance(current_user)
         
     except Exception as e:
@@ -48,22 +54,129 @@ async def record_attendance(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Error verifying user's face image: {str(e)}"
         )
-    finally:
-        delete_image(temp_public_id)
+
+
+STREAM_FRAME_TIMEOUT = 10
+
+
+@router.post("/attendance/stream")
+async def record_attendance_clip(
+    clip: UploadFile = File(...),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Allow a user to record attendance from a short video clip.
+    """
+    await check_failed_attempts(current_user.user_id)
+    if not current_user.face_url:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User has not uploaded a face image."
+        )
+    if not (clip.content_type or "").startswith("video/"):
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Check-in clip must be a video."
+        )
+    with tempfile.NamedTemporaryFile(suffix=".mp4") as temp:
+        # Copy the upload in chunks so an oversized clip is rejected without being read whole.
+        size = 0
+        while chunk := await clip.read(CLIP_CHUNK_SIZE):
+            size += len(chunk)
+            if size > MAX_CLIP_BYTES:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Check-in clip must not exceed {MAX_CLIP_BYTES // (1024 * 1024)} MB."
+                )
+            temp.write(chunk)
+        temp.flush()
+        try:
+            matched = await run_in_threadpool(verify_clip, temp.name, current_user.face_url)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Error verifying user's face image: {str(e)}"
+            )
+    if not matched:
+        await record_failed_attempt(current_user.user_id)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Face verification failed."
+        )
+    await clear_failed_attempts(current_user.user_id)
+    return await process_attendance(current_user)
+
+
+@router.websocket("/attendance/stream")
+async def record_attendance_stream(websocket: WebSocket, token: str = Query(...)):
+    """
+    Allow a user to record attendance by streaming JPEG frames over a WebSocket.
+    The token is passed as a query parameter since browsers cannot set headers on WebSockets.
+    """
+    await websocket.accept()
+    try:
+        current_user = await get_current_user(await get_current(token))
+        await check_failed_attempts(current_user.user_id)
+        if not current_user.face_url:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="User has not uploaded a face image."
+            )
+        try:
+            verifier = await run_in_threadpool(StreamVerifier.for_user, current_user.face_url)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No face detected in the reference image."
+            )
+        while verifier.frames < MAX_STREAM_FRAMES and not verifier.exhausted:
+            data = await asyncio.wait_for(websocket.receive_bytes(), timeout=STREAM_FRAME_TIMEOUT)
+            if not verifier.wants_frame():
+                continue
+            if await run_in_threadpool(verifier.offer_encoded, data):
+                await clear_failed_attempts(current_user.user_id)
+                result = await process_attendance(current_user)
+                await websocket.send_json({"status": "verified", "attendance": jsonable_encoder(result)})
+                await websocket.close()
+                return
+        if await run_in_threadpool(verifier.flush):
+            await clear_failed_attempts(current_user.user_id)
+            result = await process_attendance(current_user)
+            await websocket.send_json({"status": "verified", "attendance": jsonable_encoder(result)})
+        else:
+            await record_failed_attempt(current_user.user_id)
+            await websocket.send_json({"status": "failed", "detail": "Face verification failed."})
+        await websocket.close()
+    except WebSocketDisconnect:
+        return
+    except asyncio.TimeoutError:
+        await websocket.send_json({"status": "failed", "detail": "No frames received."})
+        await websocket.close()
+    except HTTPException as e:
+        await websocket.send_json({"status": "failed", "detail": e.detail})
+        await websocket.close(code=1008)
+    except Exception as e:
+        await websocket.send_json({"status": "failed", "detail": f"Error verifying user's face image: {str(e)}"})
+        await websocket.close(code=1011)
 
 
 @router.get("/attendance", response_model=List[dict])
 async def get_attendance_history(
+    request: Request,
+    response: Response,
     year: int = None,
     month: int = None,
     day: int = None,
     status: str = None,
+    date_from: date = Query(None, alias="from"),
+    date_to: date = Query(None, alias="to"),
     current_user: User = Depends(get_current_user)
 ):
     """
     Allow a user to view their attendance history.
     """
-    attendances = await Attendance.filter(user=current_user).order_by("-date")
+    date_from, date_to = resolve_date_range(date_from, date_to, year=year, month=month)
+    attendances = await get_attendance_rows(current_user.user_id, date_from=date_from, date_to=date_to)
     filtered_attendances = filter_by_attendance(
         attendances,
         day=day,
@@ -71,7 +184,7 @@ async def get_attendance_history(
         year=year,
         status=status
     )
-    return [
+    payload = [
         {
             "attendance_id": att.attendance_id,
             "date": att.date,
@@ -79,4 +192,5 @@ async def get_attendance_history(
             "status": att.status
         }
         for att in filtered_attendances
-    ]
\ No newline at end of file
+    ]
+    return not_modified(request, response, payload) or payload
@@ -0,0 +1,91 @@
+from fastapi import HTTPException, status
+from src.models import CheckInFailure
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple, Optional
+import hashlib
+import time
+import numpy as np
+
+
+# Verdicts of recent check-in images, keyed by user and image hash, so a resent image is not re-uploaded or re-embedded.
+# The cache is per process: with several web workers a resent image only hits it on the worker that saw it first.
+PROBE_TTL = 120
+PROBE_CACHE_SIZE = 1024
+_probes = OrderedDict()
+
+# Failed check-ins allowed per user within the window before further attempts are refused.
+# Failures are stored in the database so the limit holds across all web workers.
+MAX_FAILED_ATTEMPTS = 5
+FAILED_ATTEMPT_WINDOW = 60
+
+
+class ProbeResult(NamedTuple):
+    face_url: str
+    embedding: Optional[np.ndarray]
+    detail: Optional[str]
+    expires_at: float
+
+
+def probe_key(user_id: int, contents: bytes) -> tuple:
+    return user_id, hashlib.sha256(contents).digest()
+
+
+def get_probe(key: tuple) -> Optional[ProbeResult]:
+    """
+    Get the cached result of an identical recent check-in image, if it has not expired.
+    """
+    probe = _probes.get(key)
+    if probe is None:
+        return None
+    if probe.expires_at < time.monotonic():
+        del _probes[key]
+        return None
+    return probe
+
+
+def put_probe(key: tuple, face_url: str, embedding: Optional[np.ndarray], detail: Optional[str]):
+    """
+    Cache the embedding of a check-in image and its verdict (detail is None when verified).
+    """
+    _probes[key] = ProbeResult(face_url, embedding, detail, time.monotonic() + PROBE_TTL)
+    _probes.move_to_end(key)
+    while len(_probes) > PROBE_CACHE_SIZE:
+        _probes.popitem(last=False)
+
+
+async def check_failed_attempts(user_id: int):
+    """
+    Refuse a check-in if the user has failed too many times recently.
+    """
+    now = datetime.now(timezone.utc)
+    failures = await CheckInFailure.filter(
+        user_id=user_id,
+        failed_at__gte=now - timedelta(seconds=FAILED_ATTEMPT_WINDOW)
+    ).order_by("-failed_at").limit(MAX_FAILED_ATTEMPTS).values_list("failed_at", flat=True)
+    if len(failures) < MAX_FAILED_ATTEMPTS:
+        return
+    oldest = failures[-1]
+    oldest = oldest.replace(tzinfo=timezone.utc) if oldest.tzinfo is None else oldest
+    retry_after = int((oldest - now).total_seconds()) + FAILED_ATTEMPT_WINDOW + 1
+    raise HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many failed check-in attempts. Please try again later.",
+        headers={"Retry-After": str(max(retry_after, 1))}
+    )
+
+
+async def record_failed_attempt(user_id: int):
+    """
+    Record a failed check-in and drop the user's failures that fell out of the window.
+    """
+    now = datetime.now(timezone.utc)
+    await CheckInFailure.filter(
+        user_id=user_id,
+        failed_at__lt=now - timedelta(seconds=FAILED_ATTEMPT_WINDOW)
+    ).delete()
+    await CheckInFailure.create(user_id=user_id, failed_at=now)
+
+
+async def clear_failed_attempts(user_id: int):
+    await CheckInFailure.filter(user_id=user_id).delete()
@@ -0,0 +1,196 @@
+from collections import OrderedDict
+from functools import lru_cache
+import threading
+import os
+import numpy as np
+
+
+# DeepFace pulls in TensorFlow, Keras and OpenCV, so it is only imported on first
+# use or from warm_up(). Nothing in this module may import it at module level.
+MODEL_NAME = "VGG-Face"
+DETECTOR_BACKEND = "opencv"
+DISTANCE_METRIC = "cosine"
+REFERENCE_CACHE_SIZE = 256
+_reference_embeddings = OrderedDict()
+_reference_lock = threading.Lock()
+
+# "local" runs the model in this process, "worker" sends images to src.inference_worker.
+FACE_BACKEND = os.getenv("FACE_BACKEND", "local")
+FACE_WORKER_SOCKET = os.getenv("FACE_WORKER_SOCKET", "/tmp/face-inference.sock")
+
+# "keras" runs the full-precision model, "tflite" a quantized TFLite graph of it (see tflite_utils).
+FACE_INFERENCE = os.getenv("FACE_INFERENCE", "keras")
+TFLITE_QUANTIZATION = os.getenv("FACE_TFLITE_QUANTIZATION", "float16")
+TFLITE_THREADS = int(os.getenv("FACE_TFLITE_THREADS", str(os.cpu_count() or 1)))
+
+
+@lru_cache(maxsize=1)
+def _deepface():
+    from deepface import DeepFace
+    return DeepFace
+
+
+def _l2_normalize(embeddings: np.ndarray) -> np.ndarray:
+    return embeddings / np.linalg.norm(embeddings, axis=-1, keepdims=True)
+
+
+class LocalFaceBackend:
+    """
+    Run face detection and embedding in the current process.
+    """
+
+    def __init__(self):
+        self._client = None
+        self._lock = threading.RLock()
+
+    def _model(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = _deepface().build_model(MODEL_NAME)
+        return self._client
+
+    @property
+    def input_shape(self) -> tuple:
+        return self._model().input_shape
+
+    def warm_up(self):
+        self._model()
+
+    @lru_cache(maxsize=1)
+    def threshold(self) -> float:
+        """
+        Distance threshold DeepFace.verify uses for the model and metric.
+        """
+        from deepface.modules.verification import find_threshold
+        return find_threshold(MODEL_NAME, DISTANCE_METRIC)
+
+    def detect(self, img, target_size: tuple = None) -> np.ndarray:
+        """
+        Detect, align and preprocess the most prominent face in an image (URL or BGR array).
+        Raises ValueError if no face is detected.
+        """
+        from deepface.modules import detection, preprocessing
+        target_size = target_size or self.input_shape
+        faces = detection.extract_faces(
+            img_path=img,
+            detector_backend=DETECTOR_BACKEND,
+            grayscale=False,
+            enforce_detection=True,
+            align=True
+        )
+        face = max(faces, key=lambda f: f["facial_area"]["w"] * f["facial_area"]["h"])
+        # extract_faces returns RGB, the models expect BGR like DeepFace.represent feeds them.
+        face = face["face"][:, :, ::-1]
+        face = preprocessing.resize_image(img=face, target_size=(target_size[1], target_size[0]))
+        return preprocessing.normalize_input(img=face, normalization="base")
+
+    def embed(self, faces: list) -> np.ndarray:
+        """
+        Embed preprocessed faces in a single forward pass.
+        """
+        batch = np.concatenate(faces, axis=0)
+        embeddings = self._model().model(batch, training=False).numpy()
+        return _l2_normalize(embeddings.astype(np.float32))
+
+    def represent(self, img) -> np.ndarray:
+        return self.embed([self.detect(img)])[0]
+
+
+class TFLiteFaceBackend(LocalFaceBackend):
+    """
+    Run detection like LocalFaceBackend, but embed faces with a quantized TFLite graph.
+    The Keras model is only built when the graph has to be converted.
+    """
+
+    def __init__(self, embedder=None):
+        super().__init__()
+        self._embedder = embedder
+
+    def _tflite(self):
+        if self._embedder is None:
+            with self._lock:
+                if self._embedder is None:
+                    from src.utils.tflite_utils import TFLiteEmbedder, load_or_convert
+                    path = load_or_convert(
+                        MODEL_NAME,
+                        TFLITE_QUANTIZATION,
+                        lambda: self._model().model,
+                        detect=lambda img: self.detect(img, target_size=self._model().input_shape)
+                    )
+                    self._embedder = TFLiteEmbedder(path, num_threads=TFLITE_THREADS)
+        return self._embedder
+
+    @property
+    def input_shape(self) -> tuple:
+        return self._tflite().input_shape
+
+    def warm_up(self):
+        self._tflite()
+
+    def embed(self, faces: list) -> np.ndarray:
+        embeddings = self._tflite().embed(np.concatenate(faces, axis=0))
+        return _l2_normalize(embeddings.astype(np.float32))
+
+
+def create_local_backend() -> LocalFaceBackend:
+    """
+    Create the in-process backend for the configured inference mode.
+    """
+    if FACE_INFERENCE == "tflite":
+        return TFLiteFaceBackend()
+    return LocalFaceBackend()
+
+
+@lru_cache(maxsize=1)
+def get_backend():
+    """
+    Get the configured face backend.
+    """
+    if FACE_BACKEND == "worker":
+        from src.utils.inference_rpc import WorkerFaceBackend
+        return WorkerFaceBackend(FACE_WORKER_SOCKET)
+    return create_local_backend()
+
+
+def warm_up():
+    """
+    Load the recognition model (or connect to the worker) ahead of the first request.
+    """
+    get_backend().warm_up()
+    get_backend().threshold()
+
+
+def represent_face(img) -> np.ndarray:
+    """
+    Compute the L2-normalized embedding of the most prominent face in an image
+    (URL or BGR array). Raises ValueError if no face is detected.
+    """
+    return get_backend().represent(img)
+
+
+def get_reference_embedding(face_url: str) -> np.ndarray:
+    """
+    Get the embedding of a user's reference face image, cached by URL.
+    """
+    with _reference_lock:
+        embedding = _reference_embeddings.get(face_url)
+        if embedding is not None:
+            _reference_embeddings.move_to_end(face_url)
+            return embedding
+    embedding = represent_face(face_url)
+    with _reference_lock:
+        _reference_embeddings[face_url] = embedding
+        while len(_reference_embeddings) > REFERENCE_CACHE_SIZE:
+            _reference_embeddings.popitem(last=False)
+    return embedding
+
+
+def is_same_face(embedding: np.ndarray, reference: np.ndarray) -> bool:
+    """
+    Check whether two embeddings belong to the same person, using the same
+    distance metric and threshold as DeepFace.verify. The threshold comes from
+    the backend so that worker mode never imports DeepFace in the web process.
+    """
+    distance = 1 - np.dot(embedding, reference) / (np.linalg.norm(embedding) * np.linalg.norm(reference))
+    return distance <= get_backend().threshold()
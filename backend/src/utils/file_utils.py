@@ -1,8 +1,10 @@
 from fastapi import HTTPException, status, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from src.models import User, Attendance
 from datetime import datetime, time
-from deepface import DeepFace
-import cloudinary.uploader
+from src.utils import face_service
+from src.utils.checkin_utils import probe_key, get_probe, put_probe, record_failed_attempt, clear_failed_attempts
+from functools import lru_cache
 import os
 from dotenv import load_dotenv
 import pytz
@@ -14,12 +16,23 @@ API_KEY = os.getenv("API_KEY")
 API_SECRET = os.getenv("API_SECRET")
 
 
-cloudinary.config( 
-    cloud_name = CLOUD_NAME, 
-    api_key = API_KEY, 
-    api_secret = API_SECRET,
-    secure=True
-)
+REFERENCE_NO_FACE = "No face detected in the reference image."
+
+
+@lru_cache(maxsize=1)
+def _uploader():
+    """
+    Import and configure the Cloudinary SDK on first use.
+    """
+    import cloudinary
+    import cloudinary.uploader
+    cloudinary.config( 
+        cloud_name = CLOUD_NAME, 
+        api_key = API_KEY, 
+        api_secret = API_SECRET,
+        secure=True
+    )
+    return cloudinary.uploader
 
 
 async def upload_image(file: UploadFile, folder: str):
@@ -28,7 +41,7 @@ async def upload_image(file: UploadFile, folder: str):
     """
     try:
         contents = await file.read()
-        image = cloudinary.uploader.upload(contents, folder=folder)
+        image = _uploader().upload(contents, folder=folder)
         url = image["secure_url"]
         public_id = image["public_id"]
         return {
@@ -45,41 +58,87 @@ def delete_image(public_id: str):
     """
     Delete image from Cloudinary using public_id.
     """
-    cloudinary.uploader.destroy(public_id)
+    _uploader().destroy(public_id)
 
 
-def verify_faces(temp_url: str, face_url: str) -> bool:
+def embed_probe(temp_url: str):
     """
-    Verify if two face images belong to the same person.
+    Compute the embedding of a check-in image.
     """
     try:
-        result = DeepFace.verify(
-            img1_path=temp_url,
-            img2_path=face_url
+        return face_service.represent_face(temp_url)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No face detected in the check-in image."
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error during face verification: {str(e)}"
         )
-        if not result["verified"]:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Face verification failed."
-            )
-        return True
-    except ValueError as ve:
-        error_message = str(ve)
-        if "img1_path" in error_message:
-            detail = "No face detected in the check-in image."
-        elif "img2_path" in error_message:
-            detail = "No face detected in the reference image."
-        else:
-            detail = error_message
+
+
+def match_reference(embedding, face_url: str) -> bool:
+    """
+    Verify if a check-in embedding belongs to the owner of the reference face image.
+    """
+    try:
+        reference = face_service.get_reference_embedding(face_url)
+    except ValueError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=detail
+            detail=REFERENCE_NO_FACE
         )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error during face verification: {str(e)}"
         )
+    if not face_service.is_same_face(embedding, reference):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Face verification failed."
+        )
+    return True
+
+
+async def verify_check_in(face_image: UploadFile, current_user: User) -> bool:
+    """
+    Verify a check-in image against the user's reference face. An image identical
+    to a recent attempt replays the cached verdict without uploading or embedding it again.
+    """
+    contents = await face_image.read()
+    await face_image.seek(0)
+    key = probe_key(current_user.user_id, contents)
+    probe = get_probe(key)
+    if probe is not None and (probe.face_url == current_user.face_url or probe.embedding is None):
+        detail = probe.detail
+    else:
+        embedding = probe.embedding if probe else None
+        detail = None
+        try:
+            if embedding is None:
+                upload_result = await upload_image(face_image, folder="temp")
+                try:
+                    embedding = await run_in_threadpool(embed_probe, upload_result["secure_url"])
+                finally:
+                    delete_image(upload_result["public_id"])
+            await run_in_threadpool(match_reference, embedding, current_user.face_url)
+        except HTTPException as e:
+            # A reference image without a face is a data problem, not a failed attempt by the user.
+            if e.status_code != status.HTTP_400_BAD_REQUEST or e.detail == REFERENCE_NO_FACE:
+                raise
+            detail = e.detail
+        put_probe(key, current_user.face_url, embedding, detail)
+    if detail is not None:
+        await record_failed_attempt(current_user.user_id)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=detail
+        )
+    await clear_failed_attempts(current_user.user_id)
+    return True
 
 
 async def process_attendance(current_user: User) -> dict:
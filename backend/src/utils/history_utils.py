@@ -0,0 +1,146 @@
+from fastapi import Request, Response
+from src.models import Attendance
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta
+from typing import List, NamedTuple, Optional
+import hashlib
+import pytz
+
+
+VN_TIMEZONE = pytz.timezone("Asia/Ho_Chi_Minh")
+
+# Past months never change, so each (user_id, month) is cached once it is closed.
+HISTORY_CACHE_SIZE = 4096
+_closed_months = OrderedDict()
+
+
+class AttendanceRow(NamedTuple):
+    attendance_id: int
+    date: date
+    time: Optional[time]
+    status: str
+
+
+def _next_month(month: date) -> date:
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def closed_months(date_from: date, date_to: Optional[date], current_month: date) -> List[date]:
+    """
+    List the first day of every month before current_month that overlaps [date_from, date_to], oldest first.
+    """
+    last_month = (current_month - timedelta(days=1)).replace(day=1)
+    if date_to is not None:
+        last_month = min(last_month, date_to.replace(day=1))
+    months = []
+    month = date_from.replace(day=1)
+    while month <= last_month:
+        months.append(month)
+        month = _next_month(month)
+    return months
+
+
+def resolve_date_range(
+    date_from: date = None,
+    date_to: date = None,
+    year: int = None,
+    month: int = None
+) -> tuple:
+    """
+    Narrow a from/to range with the year and month filters so they can be resolved in SQL.
+    """
+    if month is not None and not 1 <= month <= 12:
+        month = None
+    if year is not None and not date.min.year <= year <= date.max.year:
+        # No date can match, return an empty range like the other impossible filters.
+        return date.max, date.min
+    if year is not None:
+        start = date(year, month or 1, 1)
+        end = _next_month(start) - timedelta(days=1) if month else date(year, 12, 31)
+        date_from = max(date_from, start) if date_from else start
+        date_to = min(date_to, end) if date_to else end
+    return date_from, date_to
+
+
+async def _load_rows(user_id: int, start: date, end: date) -> List[AttendanceRow]:
+    rows = await Attendance.filter(
+        user_id=user_id,
+        date__gte=start,
+        date__lte=end
+    ).order_by("-date").values_list("attendance_id", "date", "time", "status")
+    return [AttendanceRow(*row) for row in rows]
+
+
+async def _closed_month_rows(user_id: int, months: List[date]) -> dict:
+    """
+    Get the rows of closed months, loading every missing month in a single query.
+    """
+    found = {}
+    missing = []
+    for month in months:
+        rows = _closed_months.get((user_id, month))
+        if rows is None:
+            missing.append(month)
+        else:
+            _closed_months.move_to_end((user_id, month))
+            found[month] = rows
+    if missing:
+        loaded = {month: [] for month in missing}
+        for row in await _load_rows(user_id, min(missing), _next_month(max(missing)) - timedelta(days=1)):
+            month = row.date.replace(day=1)
+            if month in loaded:
+                loaded[month].append(row)
+        for month, rows in loaded.items():
+            found[month] = _closed_months[(user_id, month)] = tuple(rows)
+        while len(_closed_months) > HISTORY_CACHE_SIZE:
+            _closed_months.popitem(last=False)
+    return found
+
+
+async def get_attendance_rows(user_id: int, date_from: date = None, date_to: date = None) -> List[AttendanceRow]:
+    """
+    Get a user's attendance rows between two dates (inclusive), newest first.
+    Closed months come from the cache, only the current month is read live.
+    """
+    current_month = datetime.now(VN_TIMEZONE).date().replace(day=1)
+    if date_from is None:
+        first = await Attendance.filter(user_id=user_id).order_by("date").limit(1).values_list("date", flat=True)
+        if not first:
+            return []
+        date_from = first[0]
+    if date_to is not None and date_to < date_from:
+        return []
+
+    rows = []
+    if date_to is None or date_to >= current_month:
+        rows.extend(await _load_rows(user_id, max(date_from, current_month), date_to or date.max))
+
+    months = closed_months(date_from, date_to, current_month)
+    closed = await _closed_month_rows(user_id, months)
+    for month in reversed(months):
+        rows.extend(
+            row for row in closed[month]
+            if row.date >= date_from and (date_to is None or row.date <= date_to)
+        )
+    return rows
+
+
+def invalidate_attendance_history(user_id: int):
+    """
+    Drop every cached month of a user, e.g. when the user is deleted.
+    """
+    for key in [key for key in _closed_months if key[0] == user_id]:
+        del _closed_months[key]
+
+
+def not_modified(request: Request, response: Response, payload: list) -> Optional[Response]:
+    """
+    Set the ETag of a payload and return a 304 response if the client already has it.
+    """
+    digest = hashlib.sha1(repr(payload).encode()).hexdigest()
+    etag = f'W/"{digest}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
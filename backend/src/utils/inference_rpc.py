@@ -0,0 +1,92 @@
+from src.utils.face_service import FACE_WORKER_SOCKET
+from functools import lru_cache
+import socket
+import struct
+import json
+import numpy as np
+
+
+# Every message is a header length and a payload length (big-endian uint32),
+# followed by a JSON header and a raw binary payload.
+PREFIX = struct.Struct(">II")
+WORKER_TIMEOUT = float(30)
+
+
+def encode_message(header: dict, payload: bytes = b"") -> bytes:
+    data = json.dumps(header).encode()
+    return PREFIX.pack(len(data), len(payload)) + data + payload
+
+
+def encode_image(img) -> bytes:
+    """
+    Encode a represent request for an image given as a URL/path or a BGR array.
+    """
+    if isinstance(img, np.ndarray):
+        frame = np.ascontiguousarray(img, dtype=np.uint8)
+        return encode_message({"op": "represent", "shape": list(frame.shape)}, frame.tobytes())
+    return encode_message({"op": "represent", "path": img})
+
+
+def decode_image(header: dict, payload: bytes):
+    if "shape" in header:
+        return np.frombuffer(payload, dtype=np.uint8).reshape(header["shape"])
+    return header["path"]
+
+
+async def read_message(reader) -> tuple:
+    """
+    Read one message from an asyncio stream.
+    """
+    header_len, payload_len = PREFIX.unpack(await reader.readexactly(PREFIX.size))
+    header = json.loads(await reader.readexactly(header_len))
+    payload = await reader.readexactly(payload_len) if payload_len else b""
+    return header, payload
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            raise ConnectionError("Inference worker closed the connection.")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+class WorkerFaceBackend:
+    """
+    Send face images to a local inference worker (src.inference_worker) over a Unix socket.
+    """
+
+    def __init__(self, socket_path: str = FACE_WORKER_SOCKET):
+        self.socket_path = socket_path
+
+    def _call(self, message: bytes) -> dict:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(WORKER_TIMEOUT)
+            sock.connect(self.socket_path)
+            sock.sendall(message)
+            header_len, payload_len = PREFIX.unpack(_recv_exactly(sock, PREFIX.size))
+            header = json.loads(_recv_exactly(sock, header_len))
+            if payload_len:
+                header["payload"] = _recv_exactly(sock, payload_len)
+            return header
+
+    def warm_up(self):
+        self.threshold()
+
+    @lru_cache(maxsize=1)
+    def threshold(self) -> float:
+        """
+        Distance threshold of the worker's model, fetched once with a ping.
+        """
+        return self._call(encode_message({"op": "ping"}))["threshold"]
+
+    def represent(self, img) -> np.ndarray:
+        response = self._call(encode_image(img))
+        if response.get("error") == "no_face":
+            raise ValueError(response["detail"])
+        if "error" in response:
+            raise RuntimeError(response["detail"])
+        return np.frombuffer(response["payload"], dtype=np.float32)
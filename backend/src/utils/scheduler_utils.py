@@ -0,0 +1,145 @@
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from tortoise.exceptions import IntegrityError
+from tortoise.expressions import Q
+from src.models import SchedulerLease, JobState
+from datetime import datetime, timedelta, timezone
+import socket
+import uuid
+import os
+
+
+# Every worker process runs the same schedule, but only the holder of the lease row runs jobs.
+# A lease row works on both PostgreSQL and SQLite, unlike advisory locks.
+LEASE_NAME = "scheduler"
+LEASE_TTL = 30
+HEARTBEAT_INTERVAL = 10
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+class LeaderScheduler:
+    """
+    Run scheduled jobs in exactly one worker process. The leader renews a lease row
+    in the database, and the last run of each job is stored so that runs missed
+    while no leader was alive are caught up once a leader takes over.
+    """
+
+    def __init__(self):
+        self.scheduler = AsyncIOScheduler()
+        self.jobs = {}
+        self.running = set()
+        self.is_leader = False
+
+    def add_job(self, func, trigger: str, job_id: str = None, **trigger_args):
+        """
+        Register a coroutine function to run on the given APScheduler trigger.
+        """
+        job_id = job_id or func.__name__
+        job = self.scheduler.add_job(
+            self._run_job,
+            trigger,
+            args=[job_id],
+            id=job_id,
+            coalesce=True,
+            **trigger_args
+        )
+        self.jobs[job_id] = (func, job.trigger)
+
+    async def _acquire_lease(self) -> bool:
+        now = datetime.now(timezone.utc)
+        expires_at = now + timedelta(seconds=LEASE_TTL)
+        try:
+            updated = await SchedulerLease.filter(name=LEASE_NAME).filter(
+                Q(holder=WORKER_ID) | Q(expires_at__lt=now)
+            ).update(holder=WORKER_ID, expires_at=expires_at)
+            if not updated:
+                try:
+                    await SchedulerLease.create(name=LEASE_NAME, holder=WORKER_ID, expires_at=expires_at)
+                except IntegrityError:
+                    return False
+            return True
+        except Exception as e:
+            print(f"Error while renewing scheduler lease: {e}")
+            return False
+
+    async def _heartbeat(self):
+        was_leader = self.is_leader
+        self.is_leader = await self._acquire_lease()
+        if self.is_leader and not was_leader:
+            print(f"Worker {WORKER_ID} is now the scheduler leader")
+        if self.is_leader:
+            # Checked on every heartbeat, not only on takeover, so a run the leader itself
+            # missed (e.g. a misfire while the event loop was blocked) is also caught up.
+            await self._catch_up()
+        elif was_leader and not self.is_leader:
+            print(f"Worker {WORKER_ID} lost the scheduler lease")
+
+    async def _catch_up(self):
+        """
+        Run once every job whose last scheduled fire time passed while no leader was running it.
+        """
+        now = datetime.now(timezone.utc)
+        for job_id, (_, trigger) in self.jobs.items():
+            state = await JobState.get_or_none(job_id=job_id)
+            if state is None:
+                await JobState.create(job_id=job_id, last_run_at=now)
+                continue
+            next_run = trigger.get_next_fire_time(None, _utc(state.last_run_at) + timedelta(seconds=1))
+            if next_run is not None and next_run <= now and job_id not in self.running:
+                print(f"Catching up missed run of {job_id} scheduled at {next_run}")
+                # Run outside the heartbeat so the lease keeps being renewed during a long job.
+                self.scheduler.add_job(self._run_job, args=[job_id])
+
+    async def _run_job(self, job_id: str):
+        if job_id in self.running or not self.is_leader:
+            return
+        # Claimed before the first await so a catch-up and a scheduled run cannot overlap.
+        self.running.add(job_id)
+        if not await self._acquire_lease():
+            self.running.discard(job_id)
+            return
+        func, _ = self.jobs[job_id]
+        try:
+            await func()
+        finally:
+            try:
+                await JobState.update_or_create(
+                    defaults={"last_run_at": datetime.now(timezone.utc)},
+                    job_id=job_id
+                )
+            finally:
+                self.running.discard(job_id)
+
+    async def _check_tables(self):
+        """
+        Fail startup if the scheduler tables are missing, instead of silently never running jobs.
+        """
+        try:
+            await SchedulerLease.all().exists()
+            await JobState.all().exists()
+        except Exception as e:
+            raise RuntimeError(
+                f"Scheduler tables are not available ({e}). "
+                "Run `python -m src.database` to create them before starting the application."
+            ) from e
+
+    async def start(self):
+        await self._check_tables()
+        self.scheduler.add_job(self._heartbeat, "interval", seconds=HEARTBEAT_INTERVAL, id="scheduler_heartbeat")
+        self.scheduler.start()
+        await self._heartbeat()
+
+    async def shutdown(self):
+        self.scheduler.shutdown()
+        if self.is_leader:
+            # Expire the lease right away so another worker can take over without waiting for the TTL.
+            try:
+                await SchedulerLease.filter(name=LEASE_NAME, holder=WORKER_ID).update(
+                    expires_at=datetime.now(timezone.utc)
+                )
+            except Exception as e:
+                print(f"Error while releasing scheduler lease: {e}")
+            self.is_leader = False
@@ -0,0 +1,168 @@
+from src.utils.face_service import represent_face, get_reference_embedding, is_same_face
+from functools import lru_cache
+import numpy as np
+
+
+# OpenCV is imported inside the functions that need it to keep application import cheap.
+
+# Frames are gated on a downscaled grayscale copy so rejecting a frame stays cheap.
+GATE_WIDTH = 320
+MIN_SHARPNESS = 60.0
+MIN_FACE_SIZE = 48
+
+# Sampling starts at every BASE_STEP-th frame and backs off up to MAX_STEP on rejected frames.
+BASE_STEP = 3
+MAX_STEP = 12
+
+# Only the sharpest frame of every CANDIDATE_WINDOW gated frames is embedded.
+CANDIDATE_WINDOW = 3
+MAX_EMBEDDINGS = 5
+
+MAX_CLIP_FRAMES = 300
+MAX_CLIP_BYTES = 20 * 1024 * 1024
+CLIP_CHUNK_SIZE = 1024 * 1024
+MAX_STREAM_FRAMES = 150
+
+
+@lru_cache(maxsize=1)
+def _face_cascade():
+    import cv2
+    return cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+
+
+def frame_quality(frame: np.ndarray):
+    """
+    Return the sharpness score of a frame, or None if it is blurry or has no face.
+    """
+    import cv2
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    if gray.shape[1] > GATE_WIDTH:
+        scale = GATE_WIDTH / gray.shape[1]
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    sharpness = cv2.Laplacian(gray, cv2.CV_64F).var()
+    if sharpness < MIN_SHARPNESS:
+        return None
+    faces = _face_cascade().detectMultiScale(
+        gray,
+        scaleFactor=1.2,
+        minNeighbors=5,
+        minSize=(MIN_FACE_SIZE, MIN_FACE_SIZE)
+    )
+    if len(faces) == 0:
+        return None
+    return sharpness
+
+
+class FrameSampler:
+    """
+    Decide which frames to look at. The step doubles after each rejected frame
+    and resets once a frame passes the quality gate.
+    """
+
+    def __init__(self, base_step: int = BASE_STEP, max_step: int = MAX_STEP):
+        self.base_step = base_step
+        self.max_step = max_step
+        self.step = base_step
+        self.countdown = 0
+
+    def should_sample(self) -> bool:
+        if self.countdown > 0:
+            self.countdown -= 1
+            return False
+        self.countdown = self.step - 1
+        return True
+
+    def feedback(self, accepted: bool):
+        if accepted:
+            self.step = self.base_step
+        else:
+            self.step = min(self.step * 2, self.max_step)
+
+
+class StreamVerifier:
+    """
+    Verify a sequence of frames against a user's reference face, stopping at the first match.
+    """
+
+    def __init__(self, reference: np.ndarray):
+        self.reference = reference
+        self.sampler = FrameSampler()
+        self.candidates = []
+        self.embeddings = 0
+        self.frames = 0
+
+    @classmethod
+    def for_user(cls, face_url: str) -> "StreamVerifier":
+        return cls(get_reference_embedding(face_url))
+
+    @property
+    def exhausted(self) -> bool:
+        return self.embeddings >= MAX_EMBEDDINGS
+
+    def wants_frame(self) -> bool:
+        """
+        Count an incoming frame and tell whether it should be decoded and checked.
+        """
+        self.frames += 1
+        return self.sampler.should_sample()
+
+    def offer(self, frame: np.ndarray) -> bool:
+        """
+        Check a sampled frame. Return True once a candidate matches the reference.
+        """
+        if frame is None:
+            self.sampler.feedback(False)
+            return False
+        quality = frame_quality(frame)
+        self.sampler.feedback(quality is not None)
+        if quality is None:
+            return False
+        self.candidates.append((quality, frame))
+        if len(self.candidates) < CANDIDATE_WINDOW:
+            return False
+        return self.flush()
+
+    def offer_encoded(self, data: bytes) -> bool:
+        """
+        Decode a JPEG/PNG frame and check it.
+        """
+        import cv2
+        frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        return self.offer(frame)
+
+    def flush(self) -> bool:
+        """
+        Embed the sharpest pending candidate and compare it with the reference.
+        """
+        if not self.candidates or self.exhausted:
+            return False
+        _, frame = max(self.candidates, key=lambda c: c[0])
+        self.candidates = []
+        self.embeddings += 1
+        try:
+            embedding = represent_face(frame)
+        except ValueError:
+            return False
+        return is_same_face(embedding, self.reference)
+
+
+def verify_clip(path: str, face_url: str) -> bool:
+    """
+    Verify a short video clip against a user's reference face.
+    Skipped frames are grabbed without being decoded.
+    """
+    import cv2
+    verifier = StreamVerifier.for_user(face_url)
+    capture = cv2.VideoCapture(path)
+    try:
+        while verifier.frames < MAX_CLIP_FRAMES and not verifier.exhausted:
+            if not capture.grab():
+                break
+            if not verifier.wants_frame():
+                continue
+            ok, frame = capture.retrieve()
+            if verifier.offer(frame if ok else None):
+                return True
+        return verifier.flush()
+    finally:
+        capture.release()
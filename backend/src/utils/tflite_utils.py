@@ -0,0 +1,110 @@
+"""
+Convert the recognition model to a quantized TFLite graph and run embeddings with it.
+
+The converted graph is cached on disk. It is created on first use, or ahead of time with:
+
+    python -m src.utils.tflite_utils
+"""
+import threading
+import os
+import numpy as np
+
+
+QUANTIZATIONS = ("float16", "int8")
+TFLITE_CACHE_DIR = os.getenv("FACE_TFLITE_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".deepface", "tflite"))
+# Face images used to calibrate activation ranges for full int8 quantization.
+# Without them int8 falls back to dynamic range quantization (int8 weights, float activations).
+TFLITE_CALIBRATION_DIR = os.getenv("FACE_TFLITE_CALIBRATION_DIR")
+MAX_CALIBRATION_IMAGES = 100
+
+
+def _tf():
+    import tensorflow as tf
+    return tf
+
+
+def artifact_path(model_name: str, quantization: str) -> str:
+    calibrated = "-calibrated" if quantization == "int8" and TFLITE_CALIBRATION_DIR else ""
+    filename = f"{model_name}-{quantization}{calibrated}-tf{_tf().__version__}.tflite"
+    return os.path.join(TFLITE_CACHE_DIR, filename)
+
+
+def _calibration_faces(detect):
+    paths = sorted(
+        os.path.join(root, name)
+        for root, _, names in os.walk(TFLITE_CALIBRATION_DIR)
+        for name in names
+        if name.lower().endswith((".jpg", ".jpeg", ".png"))
+    )[:MAX_CALIBRATION_IMAGES]
+    for path in paths:
+        try:
+            yield [detect(path).astype(np.float32)]
+        except ValueError:
+            continue
+
+
+def convert_model(keras_model, quantization: str, detect=None) -> bytes:
+    """
+    Convert a Keras model to a quantized TFLite flatbuffer.
+    """
+    if quantization not in QUANTIZATIONS:
+        raise ValueError(f"Unsupported TFLite quantization: {quantization}")
+    tf = _tf()
+    converter = tf.lite.TFLiteConverter.from_keras_model(keras_model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantization == "float16":
+        converter.target_spec.supported_types = [tf.float16]
+    elif TFLITE_CALIBRATION_DIR and detect is not None:
+        converter.representative_dataset = lambda: _calibration_faces(detect)
+    return converter.convert()
+
+
+def load_or_convert(model_name: str, quantization: str, keras_model_factory, detect=None) -> str:
+    """
+    Get the path of the cached TFLite graph, converting the Keras model if it is missing.
+    """
+    path = artifact_path(model_name, quantization)
+    if not os.path.exists(path):
+        os.makedirs(TFLITE_CACHE_DIR, exist_ok=True)
+        flatbuffer = convert_model(keras_model_factory(), quantization, detect=detect)
+        # Write then rename so concurrent workers never load a partial file.
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(flatbuffer)
+        os.replace(temp_path, path)
+    return path
+
+
+class TFLiteEmbedder:
+    """
+    Run a TFLite recognition graph. The interpreter is not thread-safe, so calls are serialized.
+    """
+
+    def __init__(self, path: str, num_threads: int = None):
+        self.interpreter = _tf().lite.Interpreter(model_path=path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self.input = self.interpreter.get_input_details()[0]
+        self.output = self.interpreter.get_output_details()[0]
+        self.batch_size = 1
+        self._lock = threading.Lock()
+
+    @property
+    def input_shape(self) -> tuple:
+        # (width, height) like the DeepFace models, the input tensor is NHWC.
+        return int(self.input["shape"][2]), int(self.input["shape"][1])
+
+    def embed(self, batch: np.ndarray) -> np.ndarray:
+        with self._lock:
+            if batch.shape[0] != self.batch_size:
+                self.interpreter.resize_tensor_input(self.input["index"], [batch.shape[0], *self.input["shape"][1:]])
+                self.interpreter.allocate_tensors()
+                self.batch_size = batch.shape[0]
+            self.interpreter.set_tensor(self.input["index"], batch.astype(np.float32))
+            self.interpreter.invoke()
+            return self.interpreter.get_tensor(self.output["index"]).copy()
+
+
+if __name__ == "__main__":
+    from src.utils.face_service import TFLiteFaceBackend, MODEL_NAME, TFLITE_QUANTIZATION
+    TFLiteFaceBackend().warm_up()
+    print(f"TFLite model ready at {artifact_path(MODEL_NAME, TFLITE_QUANTIZATION)}")
@@ -0,0 +1,48 @@
+from datetime import date
+from src.utils.history_utils import closed_months, resolve_date_range
+
+
+CURRENT_MONTH = date(2025, 7, 1)
+
+
+def test_closed_months_within_one_past_month():
+    assert closed_months(date(2025, 5, 1), date(2025, 5, 31), CURRENT_MONTH) == [date(2025, 5, 1)]
+    assert closed_months(date(2025, 5, 10), date(2025, 5, 12), CURRENT_MONTH) == [date(2025, 5, 1)]
+
+
+def test_closed_months_across_year_end():
+    assert closed_months(date(2024, 11, 15), date(2025, 2, 3), CURRENT_MONTH) == [
+        date(2024, 11, 1),
+        date(2024, 12, 1),
+        date(2025, 1, 1),
+        date(2025, 2, 1),
+    ]
+
+
+def test_closed_months_open_ended_range_stops_before_current_month():
+    assert closed_months(date(2025, 4, 20), None, CURRENT_MONTH) == [
+        date(2025, 4, 1),
+        date(2025, 5, 1),
+        date(2025, 6, 1),
+    ]
+    assert closed_months(date(2025, 4, 20), date(2025, 7, 15), CURRENT_MONTH) == [
+        date(2025, 4, 1),
+        date(2025, 5, 1),
+        date(2025, 6, 1),
+    ]
+
+
+def test_closed_months_in_current_month_is_empty():
+    assert closed_months(date(2025, 7, 2), None, CURRENT_MONTH) == []
+
+
+def test_resolve_date_range_year_and_month():
+    assert resolve_date_range(year=2025, month=5) == (date(2025, 5, 1), date(2025, 5, 31))
+    assert resolve_date_range(year=2024) == (date(2024, 1, 1), date(2024, 12, 31))
+    assert resolve_date_range(date(2024, 3, 5), None, year=2024, month=3) == (date(2024, 3, 5), date(2024, 3, 31))
+
+
+def test_resolve_date_range_out_of_range_year_is_empty():
+    for year in (0, 10000):
+        date_from, date_to = resolve_date_range(year=year)
+        assert date_to < date_from